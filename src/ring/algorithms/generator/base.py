@@ -332,35 +332,58 @@ def _generator_with_extras(
         if config.cor:
             sys = sys._replace_free_with_cor()
 
-        key_start = key
-        # build generalized coordintes vector `q`
-        q_list = []
+        num_links = sys.num_links()
+        # draw all per-link keys upfront; this keeps the per-link `draw_fn`s
+        # independent in the traced graph instead of serializing them through
+        # a chain of `jax.random.split`s
+        all_keys = jax.random.split(key, 2 * num_links + 1)
+        key = all_keys[0]
+        link_keys = all_keys[1:].reshape((num_links, 2, 2))
+
+        # build generalized coordintes vector `q`; links of the same joint type
+        # share their `draw_fn`, so they are drawn with a single vmap per type
+        # instead of one traced call per link
+        groups: dict[str, list[int]] = {}
+        for link_idx, link_type in enumerate(sys.link_types):
+            groups.setdefault(link_type, []).append(link_idx)
+
+        q_offsets = [0]
+        for link_type in sys.link_types:
+            q_offsets.append(q_offsets[-1] + base.Q_WIDTHS[link_type])
+
+        q_groups, q_cols = [], []
+        for link_type, link_idxs in groups.items():
+            draw_fn = jcalc.get_joint_model(link_type).rcmg_draw_fn
+            if draw_fn is None:
+                raise Exception(f"The joint type {link_type} has no draw fn specified.")
 
-        def draw_q(key, __, link_type, link):
-            joint_params = link.joint_params
+            joint_params = sys.links.joint_params
             # limit scope
             joint_params = (
                 joint_params[link_type]
                 if link_type in joint_params
                 else joint_params["default"]
             )
-            if key is None:
-                key = key_start
-            key, key_t, key_value = jax.random.split(key, 3)
-            draw_fn = jcalc.get_joint_model(link_type).rcmg_draw_fn
-            if draw_fn is None:
-                raise Exception(f"The joint type {link_type} has no draw fn specified.")
-            q_link = draw_fn(config, key_t, key_value, sys.dt, joint_params)
-            # even revolute and prismatic joints must be 2d arrays
-            q_link = q_link if q_link.ndim == 2 else q_link[:, None]
-            q_list.append(q_link)
-            return key
-
-        keys = sys.scan(draw_q, "ll", sys.link_types, sys.links)
-        # stack of keys; only the last key is unused
-        key = keys[-1]
-
-        q = jnp.concatenate(q_list, axis=1)
+            idxs = jnp.array(link_idxs)
+            joint_params = jax.tree_map(lambda a: a[idxs], joint_params)
+
+            def _draw_q(keys_tv, joint_params):
+                q_link = draw_fn(config, keys_tv[0], keys_tv[1], sys.dt, joint_params)
+                # even revolute and prismatic joints must be 2d arrays
+                return q_link if q_link.ndim == 2 else q_link[:, None]
+
+            # (n_group, n_timesteps, q_width) -> (n_timesteps, n_group * q_width)
+            q_group = jax.vmap(_draw_q)(link_keys[idxs], joint_params)
+            q_groups.append(q_group.transpose(1, 0, 2).reshape(q_group.shape[1], -1))
+            for link_idx in link_idxs:
+                q_cols.extend(range(q_offsets[link_idx], q_offsets[link_idx + 1]))
+
+        q = jnp.concatenate(q_groups, axis=1)
+        if q_cols != sorted(q_cols):
+            # restore the original per-link column order of `q`
+            inv_perm = jnp.zeros((len(q_cols),), dtype=jnp.int32)
+            inv_perm = inv_perm.at[jnp.array(q_cols)].set(jnp.arange(len(q_cols)))
+            q = q[:, inv_perm]
 
         # do forward kinematics
         x, _ = jax.vmap(kinematics.forward_kinematics_transforms, (None, 0))(sys, q)
@@ -1,7 +1,11 @@
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+import queue
 import random
+import threading
 from typing import Optional
 import warnings
+import weakref
 
 import jax
 import jax.numpy as jnp
@@ -14,10 +18,24 @@ from tree_utils import tree_batch
 
 
 def _build_batch_matrix(batchsizes: list[int]) -> jax.Array:
-    arr = []
-    for i, l in enumerate(batchsizes):
-        arr += [i] * l
-    return jnp.array(arr)
+    return jnp.asarray(
+        np.repeat(np.arange(len(batchsizes), dtype=np.int32), batchsizes)
+    )
+
+
+def _tree_unbatch_to_list(tree: tree_utils.PyTree, size: int) -> list:
+    "Splits a batched PyTree into a list of `size` unbatched PyTrees."
+    leaves, treedef = jax.tree_util.tree_flatten(tree)
+    # start all device-to-host copies before blocking on any single leaf, so
+    # that the offload is one bulk transfer instead of per-leaf dispatches
+    for leaf in leaves:
+        if hasattr(leaf, "copy_to_host_async"):
+            leaf.copy_to_host_async()
+    leaves = [np.asarray(leaf) for leaf in leaves]
+    return [
+        jax.tree_util.tree_unflatten(treedef, [leaf[i] for leaf in leaves])
+        for i in range(size)
+    ]
 
 
 def batch_generators_lazy(
@@ -35,23 +53,39 @@ def batch_generators_lazy(
     batch_arr = _build_batch_matrix(batchsizes)
     bs_total = len(batch_arr)
     pmap, vmap = utils.distribute_batchsize(bs_total)
-    batch_arr = batch_arr.reshape((pmap, vmap))
 
-    pmap_trafo = jax.pmap
-    # single GPU node, then do jit + vmap instead of pmap
-    # this allows e.g. better NAN debugging capabilities
     if pmap == 1:
-        pmap_trafo = lambda f: jax.jit(jax.vmap(f))
-    if not jit:
-        pmap_trafo = lambda f: jax.vmap(f)
+        # single GPU node, then do jit + vmap instead of pmap
+        # this allows e.g. better NAN debugging capabilities; keys and outputs
+        # stay flat so no degenerate size-1 axis enters the compiled HLO
+        pmap_trafo = jax.jit if jit else (lambda f: f)
+    else:
+        batch_arr = batch_arr.reshape((pmap, vmap))
+        pmap_trafo = jax.pmap if jit else jax.vmap
+
+    if len(generators) == 1:
+        # no branching required; this keeps the compiled graph free of
+        # `lax.switch` so XLA can fuse across the entire batch axis
+        @pmap_trafo
+        @jax.vmap
+        def _generator(key, which_gen: int):
+            return generators[0](key)
+
+    else:
 
-    @pmap_trafo
-    @jax.vmap
-    def _generator(key, which_gen: int):
-        return jax.lax.switch(which_gen, generators, key)
+        @pmap_trafo
+        @jax.vmap
+        def _generator(key, which_gen: int):
+            return jax.lax.switch(which_gen, generators, key)
 
     def generator(key):
-        pmap_vmap_keys = jax.random.split(key, bs_total).reshape((pmap, vmap, 2))
+        if pmap == 1:
+            return _generator(jax.random.split(key, bs_total), batch_arr)
+
+        # hierarchical split; each device key only splits `vmap`-many times
+        # instead of one flat `bs_total`-sized split plus reshape
+        keys_pmap = jax.random.split(key, pmap)
+        pmap_vmap_keys = jax.vmap(lambda k: jax.random.split(k, vmap))(keys_pmap)
         data = _generator(pmap_vmap_keys, batch_arr)
 
         # merge pmap and vmap axis
@@ -61,6 +95,26 @@ def batch_generators_lazy(
     return generator
 
 
+_lazy_cache = weakref.WeakKeyDictionary()
+
+
+def _batch_generators_lazy_cached(
+    gen: types.Generator, size: int, jit: bool
+) -> types.BatchedGenerator:
+    # cached on the identity of `gen`, so that repeated eager materializations
+    # (e.g. `to_list` followed by `to_pickle`) don't re-trace and re-compile;
+    # the key is weak so entries (and their compiled executables) die with
+    # their generator instead of accumulating for the process lifetime
+    try:
+        cache = _lazy_cache.setdefault(gen, {})
+    except TypeError:
+        # `gen` does not support weak references
+        return batch_generators_lazy(gen, size, jit=jit)
+    if (size, jit) not in cache:
+        cache[(size, jit)] = batch_generators_lazy(gen, size, jit=jit)
+    return cache[(size, jit)]
+
+
 def batch_generators_eager_to_list(
     generators: types.Generator | list[types.Generator],
     sizes: int | list[int],
@@ -70,14 +124,22 @@ def batch_generators_eager_to_list(
     "Returns list of unbatched sequences as numpy arrays."
     generators, sizes = _process_sizes_batchsizes_generators(generators, sizes)
 
-    key = jax.random.PRNGKey(seed)
-    data = []
-    for gen, size in tqdm(zip(generators, sizes), desc="eager data generation"):
-        key, consume = jax.random.split(key)
-        sample = batch_generators_lazy(gen, size, jit=jit)(consume)
-        # converts also to numpy
-        sample = jax.device_get(sample)
-        data.extend([jax.tree_map(lambda a: a[i], sample) for i in range(size)])
+    keys = jax.random.split(jax.random.PRNGKey(seed), len(generators))
+
+    def _sample(gen, size, key):
+        sample = _batch_generators_lazy_cached(gen, size, jit)(key)
+        # also converts to numpy
+        return _tree_unbatch_to_list(sample, size)
+
+    # dispatch all generators at once; jax releases the GIL during device
+    # computation so compile, compute and offload overlap across generators
+    with ThreadPoolExecutor(max_workers=len(generators)) as pool:
+        samples = pool.map(_sample, generators, sizes, keys)
+        data = []
+        for sample in tqdm(
+            samples, desc="eager data generation", total=len(generators)
+        ):
+            data.extend(sample)
     return data
 
 
@@ -143,10 +205,7 @@ def _data_fn_from_paths(
         def load_fn(path):
             tree = load_from_path(path)
             tree = tree if tree_transform is None else tree_transform(tree)
-            return [
-                jax.tree_map(lambda arr: arr[i], tree)
-                for i in range(tree_utils.tree_shape(tree))
-            ]
+            return _tree_unbatch_to_list(tree, tree_utils.tree_shape(tree))
 
         if paths != _paths or len(_list_of_data) == 0:
             _paths = paths
@@ -180,21 +239,26 @@ def _generator_from_data_fn(
     shuffle: bool,
     batchsize: int,
 ) -> types.BatchedGenerator:
-    # such that we don't mutate out of scope
-    include_samples = include_samples.copy()
+    # such that we don't mutate out of scope; shuffling an integer array is a
+    # single C loop instead of Fisher-Yates over Python objects
+    include_samples = np.asarray(include_samples)
 
     N = len(include_samples)
-    n_batches, i = N // batchsize, 0
+    n_batches = N // batchsize
 
-    def generator(key: jax.Array):
-        nonlocal i
-        if shuffle and i == 0:
-            random.shuffle(include_samples)
+    def _batch_indices():
+        while True:
+            if shuffle:
+                np.random.shuffle(include_samples)
+            for i in range(n_batches):
+                yield include_samples[i * batchsize : (i + 1) * batchsize]
 
-        start, stop = i * batchsize, (i + 1) * batchsize
-        batch = data_fn(include_samples[start:stop])
+    # a single `next` replaces the read-modify-write counter; this keeps the
+    # iteration order intact when the generator is driven by a prefetch thread
+    batch_indices = _batch_indices()
 
-        i = (i + 1) % n_batches
+    def generator(key: jax.Array):
+        batch = data_fn(next(batch_indices))
         return utils.pytree_deepcopy(batch)
 
     return generator
@@ -221,19 +285,60 @@ def batched_generator_from_paths(
     return generator, N
 
 
+def _prefetch_generator(gen: types.BatchedGenerator) -> types.BatchedGenerator:
+    """Builds and transfers the next batch in a background thread.
+
+    NOTE: the worker thread and the one device-resident batch it holds stay
+    alive for the remaining process lifetime.
+    """
+    batches = queue.Queue(maxsize=1)
+
+    def worker():
+        while True:
+            try:
+                # `device_put` is async, so the host-to-device transfer of the
+                # next batch overlaps with compute on the previous one
+                batch = jax.device_put(gen(None))
+            except Exception as e:
+                # hand the exception to the consumer; without this the thread
+                # would die silently and `batches.get()` block forever
+                batches.put(e)
+                return
+            batches.put(batch)
+
+    threading.Thread(target=worker, daemon=True).start()
+
+    def generator(key: jax.Array):
+        batch = batches.get()
+        if isinstance(batch, Exception):
+            raise batch
+        return batch
+
+    return generator
+
+
 def batched_generator_from_list(
     data: list,
     batchsize: int,
     shuffle: bool = True,
     drop_last: bool = True,
+    prefetch: bool = True,
 ) -> types.BatchedGenerator:
     assert drop_last, "Not `drop_last` is currently not implemented."
     assert len(data) >= batchsize
 
+    # stack the entire dataset once; each batch is then a single fancy-index
+    # per leaf instead of re-stacking `batchsize` pytrees on every call
+    data_stacked = tree_batch(data, backend="numpy")
+
     def data_fn(indices: list[int]):
-        return tree_batch([data[i] for i in indices])
+        indices = np.asarray(indices)
+        return jax.tree_util.tree_map(lambda arr: arr[indices], data_stacked)
 
-    return _generator_from_data_fn(data_fn, list(range(len(data))), shuffle, batchsize)
+    generator = _generator_from_data_fn(
+        data_fn, list(range(len(data))), shuffle, batchsize
+    )
+    return _prefetch_generator(generator) if prefetch else generator
 
 
 def batch_generators_eager(
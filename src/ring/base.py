@@ -1,3 +1,4 @@
+import functools
 from pathlib import Path
 from typing import Any, Callable, Optional, Sequence, Union
 
@@ -397,6 +398,11 @@ QD_WIDTHS = {
 }
 
 
+@functools.lru_cache(maxsize=None)
+def _name_to_idx_map(link_names: tuple[str]) -> dict[str, int]:
+    return {name: idx for idx, name in enumerate(link_names)}
+
+
 @struct.dataclass
 class System(_Base):
     link_parents: list[int] = struct.field(False)
@@ -434,7 +440,9 @@ class System(_Base):
         return sum([QD_WIDTHS[typ] for typ in self.link_types])
 
     def name_to_idx(self, name: str) -> int:
-        return self.link_names.index(name)
+        # O(1) via a cached map; `.index` re-scans the list on every call
+        # which adds up when this is hit once per link inside traced code
+        return _name_to_idx_map(tuple(self.link_names))[name]
 
     def idx_to_name(self, idx: int, allow_world: bool = False) -> str:
         if allow_world and idx == -1:
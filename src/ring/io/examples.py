@@ -1,3 +1,4 @@
+from functools import lru_cache
 from pathlib import Path
 from typing import Iterator
 
@@ -9,18 +10,20 @@ FOLDERS = ["", "test_morph_system"]
 EXCLUDE_FOLDERS = ["exclude"]
 
 
-def load_example(name: str):
-    "Load example from examples dir."
+@lru_cache(maxsize=None)
+def load_example(name: str) -> base.System:
+    "Load example from examples dir. The loaded system is cached."
 
     xml_path = parse_path(EXAMPLES_DIR, name, extension="xml")
     return base.System.from_xml(xml_path)
 
 
+@lru_cache(maxsize=1)
 def list_examples() -> list[str]:
     import os
 
     def list_of_examples_in_folder(folder):
-        return [ex.split(".")[0] for ex in os.listdir(folder)]
+        return [os.path.splitext(ex.name)[0] for ex in os.scandir(folder)]
 
     examples = []
     for folder in FOLDERS:
@@ -266,6 +266,22 @@ def quat_to_rot_axis(q):
     return axis, angle
 
 
+@partial(jnp.vectorize, signature="(4),()->(4)")
+def quat_scale_angle(q, factor):
+    """Scale the rotation angle of quaternion `q` by `factor`.
+
+    Closed-form equivalent of `quat_rot_axis(*reversed(quat_to_rot_axis(q)))`
+    with the angle multiplied by `factor`, but without rebuilding the axis.
+    """
+    norm_v = safe_norm(q[1:])[0]
+    half_angle = 0.5 * factor * wrap_to_pi(2 * jnp.arctan2(norm_v, q[0]))
+    # sin(half_angle) / norm_v maps the vector part onto the new angle;
+    # `factor` is its exact limit for angle -> 0
+    safe_norm_v = jnp.where(norm_v < 1e-6, 1.0, norm_v)
+    scale = jnp.where(norm_v < 1e-6, factor, jnp.sin(half_angle) / safe_norm_v)
+    return jnp.concatenate((jnp.cos(half_angle)[None], q[1:] * scale))
+
+
 @partial(jnp.vectorize, signature="(3)->(4)")
 def euler_to_quat(angles: jnp.ndarray) -> jnp.ndarray:
     """Converts euler rotations in radians to quaternion."""
@@ -1,9 +1,9 @@
 from abc import ABC
 from abc import abstractmethod
+from functools import lru_cache
 
 import jax
 import jax.numpy as jnp
-import tree_utils
 
 import ring
 from ring.utils import pickle_load
@@ -13,13 +13,13 @@ from ring.utils import pickle_save
 def _to_3d(tree):
     if tree is None:
         return None
-    return jax.tree_map(lambda arr: arr[None], tree)
+    return jax.tree_map(lambda arr: jnp.expand_dims(arr, 0), tree)
 
 
-def _to_2d(tree, i: int = 0):
+def _to_2d(tree):
     if tree is None:
         return None
-    return jax.tree_map(lambda arr: arr[i], tree)
+    return jax.tree_map(lambda arr: jnp.squeeze(arr, 0), tree)
 
 
 class AbstractFilter(ABC):
@@ -84,15 +84,33 @@ class AbstractFilterUnbatched(AbstractFilter):
         pass
 
     def _apply_batched(self, X, params, state, y, lam):
-        N = X.shape[0]
-        ys = []
-        for i in range(N):
-            ys.append(
-                self._apply_unbatched(
-                    _to_2d(X, i), params, _to_2d(state, i), _to_2d(y, i), lam
-                )
-            )
-        return tree_utils.tree_batch(ys)
+        # one batched kernel instead of one dispatch per batch element;
+        # `params` and `lam` are batch-invariant and thus broadcast
+        return jax.vmap(
+            lambda X, state, y: self._apply_unbatched(X, params, state, y, lam)
+        )(X, state, y)
+
+
+class AbstractFilterStepwise(AbstractFilter):
+    """Filters that implement a single timestep; `apply` rolls the step out
+    over the time axis with one `jax.lax.scan` instead of a Python loop."""
+
+    @abstractmethod
+    def _step(self, X_t, params, state, lam):
+        "(X_t, params, state, lam) -> (yhat_t, state)"
+        pass
+
+    def _apply_batched(self, X, params, state, y, lam):
+        if state is None:
+            _, state = self.init(bs=X.shape[0], X=X, lam=lam)
+
+        def scan_fn(carry, X_t):
+            yhat_t, carry = self._step(X_t, params, carry, lam)
+            return carry, yhat_t
+
+        # time axis leads during the scan
+        state, yhat = jax.lax.scan(scan_fn, state, X.swapaxes(0, 1))
+        return yhat.swapaxes(0, 1), state
 
 
 class AbstractFilterWrapper(AbstractFilter):
@@ -171,24 +189,18 @@ class LPF_FilterWrapper(AbstractFilterWrapper):
 
         yhat, state = super().apply(X, params, state, y, lam)
 
-        if yhat.ndim == 4:
-            yhat = jax.vmap(
-                jax.vmap(
-                    lambda q, samp_freq: ring.maths.quat_lowpassfilter(
-                        q, samp_freq=samp_freq, **self._kwargs
-                    ),
-                    in_axes=(1, None),
-                    out_axes=1,
-                )
-            )(yhat, samp_freq)
-        else:
-            yhat = jax.vmap(
-                lambda q, samp_freq: ring.maths.quat_lowpassfilter(
-                    q, samp_freq=samp_freq, **self._kwargs
-                ),
-                in_axes=(1, None),
-                out_axes=1,
-            )(yhat, samp_freq)
+        lpf = jnp.vectorize(
+            lambda q, samp_freq: ring.maths.quat_lowpassfilter(
+                q, samp_freq=samp_freq, **self._kwargs
+            ),
+            signature="(t,q),()->(t,q)",
+        )
+        # move the link axis in front of time so that (time, quat) are the
+        # core dimensions; one vectorize then covers both the batched and the
+        # unbatched case without nested vmaps
+        yhat = jnp.moveaxis(yhat, -2, -3)
+        yhat = lpf(yhat, samp_freq[:, None] if yhat.ndim == 4 else samp_freq)
+        yhat = jnp.moveaxis(yhat, -3, -2)
         return yhat, state
 
 
@@ -212,17 +224,31 @@ class GroundTruthHeading_FilterWrapper(AbstractFilterWrapper):
             return yhat
 
         assert lam is not None
-        yhat = jnp.array(yhat)
-        for i, p in enumerate(lam):
-            if p == -1:
-                yhat = yhat.at[..., i, :].set(
-                    ring.maths.quat_transfer_heading(y[..., i, :], yhat[..., i, :])
-                )
-        return yhat
+        mask = _root_mask(tuple(lam))
+        if not mask.any():
+            return yhat
+        # transfer the heading for all links at once and blend with a single
+        # `where` instead of one scatter per root link
+        transferred = jnp.vectorize(
+            ring.maths.quat_transfer_heading, signature="(q),(q)->(q)"
+        )(y, yhat)
+        return jnp.where(mask[:, None], transferred, yhat)
+
+
+@lru_cache(maxsize=None)
+def _root_mask(lam: tuple[int]) -> jax.Array:
+    "Mask of links that connect to the worldbody; constant per `lam`."
+    return jnp.array([p == -1 for p in lam])
 
 
 _default_factors = dict(gyr=1 / 2.2, acc=1 / 9.81, joint_axes=1 / 0.57, dt=10.0)
 
+# the dict-based implementation flattened the features with
+# `batch_concat_acme`, which orders dict entries by sorted key; for F=10 that
+# moves `dt` in front of `gyr` and the published parameters expect exactly
+# this column layout
+_F10_COLUMN_PERM = (0, 1, 2, 9, 3, 4, 5, 6, 7, 8)
+
 
 class ScaleX_FilterWrapper(AbstractFilterWrapper):
 
@@ -234,23 +260,34 @@ class ScaleX_FilterWrapper(AbstractFilterWrapper):
     ) -> None:
         super().__init__(filter, name)
         self._factors = factors
+        self._scales = {}
+
+    def _scale(self, F: int) -> jax.Array:
+        # one constant per feature layout; a broadcast multiply with it
+        # replaces the dict split + concat round-trip
+        if F not in self._scales:
+            fs = self._factors
+            if F == 6:
+                diag = 3 * [fs["acc"]] + 3 * [fs["gyr"]]
+            elif F == 9:
+                diag = 3 * [fs["acc"]] + 3 * [fs["gyr"]] + 3 * [fs["joint_axes"]]
+            elif F == 10:
+                diag = (
+                    3 * [fs["acc"]]
+                    + 3 * [fs["gyr"]]
+                    + 3 * [fs["joint_axes"]]
+                    + [fs["dt"]]
+                )
+            else:
+                raise Exception(f"X.shape[-1]={F}")
+            self._scales[F] = jnp.array(diag)
+        return self._scales[F]
 
     def apply(self, X, params=None, state=None, y=None, lam=None):
         F = X.shape[-1]
-        num_batch_dims = X.ndim - 1
-
-        if F == 6:
-            X = dict(acc=X[..., :3], gyr=X[..., 3:])
-        elif F == 9:
-            X = dict(acc=X[..., :3], gyr=X[..., 3:6], joint_axes=X[..., 6:])
-        elif F == 10:
-            X = dict(
-                acc=X[..., :3], gyr=X[..., 3:6], joint_axes=X[..., 6:9], dt=X[..., 9:10]
-            )
-        else:
-            raise Exception(f"X.shape={X.shape}")
-        X = {key: val * self._factors[key] for key, val in X.items()}
-        X = tree_utils.batch_concat_acme(X, num_batch_dims=num_batch_dims)
+        X = X * self._scale(F)
+        if F == 10:
+            X = X[..., jnp.array(_F10_COLUMN_PERM)]
         return super().apply(X, params, state, y, lam)
 
 
@@ -54,6 +54,8 @@ def _build_eval_fn2(
             ), f"The metric identitifier {metric_name} is not unique"
             value = jax.vmap(metric_fn, in_axes=(2, 2))(y_4d, yhat)
             assert value.ndim == 1, f"{value.shape}"
+            # one device sync for all links instead of one per link entry
+            value = jax.device_get(value)
             value = {name: value[i] for i, name in enumerate(link_names)}
             values[metric_name] = value
         return values
@@ -10,6 +10,7 @@ import tree_utils
 
 from ring.maths import safe_normalize
 from ring.ml import base as ml_base
+from ring.utils import msgpack_load
 from ring.utils import pickle_load
 
 
@@ -191,14 +192,30 @@ class LSTM(hk.RNNCore):
 
 
 class RING(ml_base.AbstractFilter):
-    def __init__(self, params=None, lam=None, jit: bool = True, name=None, **kwargs):
+    def __init__(
+        self,
+        params=None,
+        lam=None,
+        jit: bool = True,
+        name=None,
+        donate_buffers: bool = False,
+        **kwargs,
+    ):
+        """`donate_buffers` donates the `X` and `state` buffers to the jitted
+        `apply`, halving its peak memory; the caller-side arrays are then
+        invalidated, so a state must not be reused across `apply` calls."""
         self.forward_lam_factory = partial(make_ring, **kwargs)
         self.params = self._load_params(params)
         self.lam = lam
         self._name = name
+        self._donate_buffers = donate_buffers
 
         if jit:
-            self.apply = jax.jit(self.apply, static_argnames="lam")
+            self.apply = jax.jit(
+                self.apply,
+                static_argnames="lam",
+                donate_argnames=("X", "state") if donate_buffers else (),
+            )
 
     def apply(self, X, params=None, state=None, y=None, lam=None):
         if lam is None:
@@ -258,11 +275,18 @@ class RING(ml_base.AbstractFilter):
     def _load_params(params: str | dict | None | Path):
         assert isinstance(params, (str, dict, type(None), Path))
         if isinstance(params, (Path, str)):
+            if Path(params).suffix == ".msgpack":
+                return msgpack_load(params)
             return pickle_load(params)
         return params
 
     def nojit(self) -> "RING":
-        ringnet = RING(params=self.params, lam=self.lam, jit=False)
+        ringnet = RING(
+            params=self.params,
+            lam=self.lam,
+            jit=False,
+            donate_buffers=getattr(self, "_donate_buffers", False),
+        )
         ringnet.forward_lam_factory = self.forward_lam_factory
         return ringnet
 
@@ -275,5 +299,10 @@ class RING(ml_base.AbstractFilter):
     @staticmethod
     def _post_load(ringnet: "RING", jit: bool = True) -> "RING":
         if jit:
-            ringnet.apply = jax.jit(ringnet.apply, static_argnames="lam")
+            donate = getattr(ringnet, "_donate_buffers", False)
+            ringnet.apply = jax.jit(
+                ringnet.apply,
+                static_argnames="lam",
+                donate_argnames=("X", "state") if donate else (),
+            )
         return ringnet
@@ -44,6 +44,13 @@ _rgbas = {
 }
 
 
+def _unbatch_to_list(xs: base.Transform, step: int = 1) -> list[base.Transform]:
+    # one bulk device-to-host transfer; the per-frame slicing then happens in
+    # host numpy instead of paying one device sync per timestep
+    xs = jax.tree_map(np.asarray, xs)
+    return [jax.tree_map(lambda arr: arr[t], xs) for t in range(0, xs.shape(), step)]
+
+
 def render(
     sys: base.System,
     xs: Optional[base.Transform | list[base.Transform]] = None,
@@ -100,7 +107,7 @@ def render(
 
     # convert time-axis of batched xs object into a list of unbatched x objects
     if isinstance(xs, base.Transform) and xs.ndim() == 3:
-        xs = [xs[t] for t in range(xs.shape())]
+        xs = _unbatch_to_list(xs)
 
     # ensure that a single unbatched x object is also a list
     xs = utils.to_list(xs)
@@ -202,8 +209,7 @@ def render_prediction(
         xs_render.append(xs_dict[name])
     xs_render = xs_render[0].batch(*xs_render[1:])
     xs_render = xs_render.transpose((1, 0, 2))
-    N = xs_render.shape()
-    xs_render = [xs_render[t] for t in range(0, N, stepframe)]
+    xs_render = _unbatch_to_list(xs_render, stepframe)
 
     frames = render(sys_render, xs_render, **kwargs)
 
@@ -1,6 +1,9 @@
+from functools import partial
+import os
 from typing import Optional, Tuple
 
 import jax
+import jax.numpy as jnp
 from ring import algebra
 from ring import base
 from ring import io
@@ -46,28 +49,29 @@ def xs_from_raw(
     else:
         t_eps = base.Transform.zero()
 
-    # build `xs` from optical motion capture data
-    xs = []
+    # build `xs` from optical motion capture data; stack the per-link
+    # trajectories once and invert + compose them as a single (T, L, ...)
+    # batch directly in time-major layout
+    rot = jnp.stack(
+        [link_name_pos_rot[name]["quat"] for name in sys.link_names], axis=1
+    )
+    if qinv:
+        rot = maths.quat_inv(rot)
+    zero_pos = jnp.zeros(rot.shape[:1] + (3,))
+    pos = jnp.stack(
+        [link_name_pos_rot[name].get("pos", zero_pos) for name in sys.link_names],
+        axis=1,
+    )
+    xs = base.Transform(pos, rot)
+    return algebra.transform_mul(xs, algebra.transform_inv(t_eps))
 
-    def f(_, __, link_name: str):
-        q = link_name_pos_rot[link_name]["quat"]
-        pos = link_name_pos_rot[link_name].get("pos", None)
-        if qinv:
-            q = maths.quat_inv(q)
-        t = base.Transform.create(pos, q)
-        t = algebra.transform_mul(t, algebra.transform_inv(t_eps))
-        xs.append(t)
 
-    sys.scan(f, "l", sys.link_names)
-
-    # stack and permute such that time-axis is 0-th axis
-    xs = xs[0].batch(*xs[1:])
-    xs = xs.transpose((1, 0, 2))
-    return xs
+def _astype(xs: base.Transform, dtype) -> base.Transform:
+    return jax.tree_map(lambda a: a.astype(dtype), xs)
 
 
 def match_xs(
-    sys: base.System, xs: base.Transform, sys_xs: base.System
+    sys: base.System, xs: base.Transform, sys_xs: base.System, dtype=None
 ) -> base.Transform:
     """Match tranforms `xs` to subsystem `sys`.
 
@@ -75,27 +79,29 @@ def match_xs(
         sys (System): Smaller system. Every link in `sys` must be in `sys_xs`.
         xs (Transform): Transforms of larger system.
         sys_xs (Transform): Larger system.
+        dtype (optional): Carry the gather in this dtype (e.g. `jnp.bfloat16`)
+            to halve the bandwidth it moves; the result is cast back.
 
     Returns:
         Transform: Transforms of smaller system.
     """
     _checks_time_series_of_xs(sys_xs, xs)
 
-    xs_small = xs_from_raw(
-        sys,
-        {
-            name: {
-                "pos": xs.pos[:, sys_xs.name_to_idx(name)],
-                "quat": xs.rot[:, sys_xs.name_to_idx(name)],
-            }
-            for name in sys_xs.link_names
-        },
-        eps_frame=None,
-        qinv=False,
-    )
-    return xs_small
+    in_dtype = xs.pos.dtype
+    if dtype is not None:
+        xs = _astype(xs, dtype)
+
+    # without an eps-frame and without qinv, `xs_from_raw` would only
+    # re-stack what two gathers select here directly
+    idx = jnp.array([sys_xs.name_to_idx(name) for name in sys.link_names])
+    xs = base.Transform(xs.pos[:, idx], xs.rot[:, idx])
+
+    if dtype is not None:
+        xs = _astype(xs, in_dtype)
+    return xs
 
 
+@jax.jit
 def unzip_xs(
     sys: base.System, xs: base.Transform
 ) -> Tuple[base.Transform, base.Transform]:
@@ -111,25 +117,29 @@ def unzip_xs(
     """
     _checks_time_series_of_xs(sys, xs)
 
-    @jax.vmap
-    def _unzip_xs(xs):
-        def f(_, __, i: int, p: int):
-            if p == -1:
-                x_parent_to_link = xs[i]
-            else:
-                x_parent_to_link = algebra.transform_mul(
-                    xs[i], algebra.transform_inv(xs[p])
-                )
-
-            transform1_pos = base.Transform.create(pos=x_parent_to_link.pos)
-            transform2_rot = base.Transform.create(rot=x_parent_to_link.rot)
-            return (transform1_pos, transform2_rot)
-
-        return sys.scan(f, "ll", list(range(sys.num_links())), sys.link_parents)
+    # gather all parent transforms with one take; links that connect to world
+    # gather themselves and are restored afterwards, so the whole split is a
+    # handful of batched ops instead of one chain per link
+    is_root = jnp.array([p == -1 for p in sys.link_parents])
+    parent_idx = jnp.array(
+        [i if p == -1 else p for i, p in enumerate(sys.link_parents)]
+    )
+    xs_parent = jax.tree_map(lambda a: a[:, parent_idx], xs)
+    x_parent_to_link = algebra.transform_mul(xs, algebra.transform_inv(xs_parent))
+    x_parent_to_link = jax.tree_map(
+        lambda root_case, parent_case: jnp.where(
+            is_root[:, None], root_case, parent_case
+        ),
+        xs,
+        x_parent_to_link,
+    )
 
-    return _unzip_xs(xs)
+    transform1 = base.Transform.create(pos=x_parent_to_link.pos)
+    transform2 = base.Transform.create(rot=x_parent_to_link.rot)
+    return transform1, transform2
 
 
+@jax.jit
 def zip_xs(
     sys: base.System,
     xs_transform1: base.Transform,
@@ -148,43 +158,79 @@ def zip_xs(
     _checks_time_series_of_xs(sys, xs_transform1)
     _checks_time_series_of_xs(sys, xs_transform2)
 
-    @jax.vmap
-    def _zip_xs(xs_transform1, xs_transform2):
-        eps_to_l = {-1: base.Transform.zero()}
+    num_links = sys.num_links()
+
+    # parent-to-child transforms, batched over time and links; links lead
+    # so that the scan below walks the kinematic tree
+    transform = algebra.transform_mul(xs_transform2, xs_transform1)
+    transform = jax.tree_map(lambda a: jnp.moveaxis(a, 1, 0), transform)
 
-        def f(_, __, i: int, p: int):
-            transform = algebra.transform_mul(xs_transform2[i], xs_transform1[i])
-            eps_to_l[i] = algebra.transform_mul(transform, eps_to_l[p])
-            return eps_to_l[i]
+    # slot `num_links` holds the identity for links that connect to world
+    parents = jnp.array(
+        [p if p != -1 else num_links for p in sys.link_parents], dtype=jnp.int32
+    )
+    eps_to_l0 = base.Transform.zero(
+        (num_links + 1, tree_utils.tree_shape(transform, axis=1))
+    )
+    # carry in the input dtype so reduced-precision callers stay reduced
+    eps_to_l0 = _astype(eps_to_l0, transform.pos.dtype)
+
+    def body(eps_to_l, scan_in):
+        i, p, transform_i = scan_in
+        eps_to_l_i = algebra.transform_mul(transform_i, eps_to_l.take(p))
+        eps_to_l = jax.tree_map(lambda a, e: a.at[i].set(e), eps_to_l, eps_to_l_i)
+        return eps_to_l, eps_to_l_i
+
+    _, ys = jax.lax.scan(body, eps_to_l0, (jnp.arange(num_links), parents, transform))
+    return jax.tree_map(lambda a: jnp.moveaxis(a, 0, 1), ys)
 
-        return sys.scan(f, "ll", list(range(sys.num_links())), sys.link_parents)
 
-    return _zip_xs(xs_transform1, xs_transform2)
+# the shape checks walk all pytree leaves and re-execute on every trace;
+# they can be disabled for production pipelines that call these functions
+# per-step
+_CHECK_SHAPES = os.environ.get("RING_CHECK_SHAPES", "1") == "1"
 
 
 def _checks_time_series_of_xs(sys, xs):
+    if not _CHECK_SHAPES:
+        return
     assert tree_utils.tree_ndim(xs) == 3, f"pos.shape={xs.pos.shape}"
     num_links_xs, num_links_sys = tree_utils.tree_shape(xs, axis=1), sys.num_links()
     assert num_links_xs == num_links_sys, f"{num_links_xs} != {num_links_sys}"
 
 
-def delete_to_world_pos_rot(sys: base.System, xs: base.Transform) -> base.Transform:
+@partial(jax.jit, static_argnames="dtype")
+def delete_to_world_pos_rot(
+    sys: base.System, xs: base.Transform, dtype=None
+) -> base.Transform:
     """Replace the transforms of all links that connect to the worldbody
     by unity transforms.
 
     Args:
         sys (System): System only used for structure (in scan_sys).
         xs (Transform): Time-series of transforms to be modified.
+        dtype (optional): Carry the unzip / zip round-trip in this dtype
+            (e.g. `jnp.bfloat16`) to halve its bandwidth; the result is
+            cast back.
 
     Returns:
         Transform: Time-series of modified transforms.
     """
     _checks_time_series_of_xs(sys, xs)
 
+    in_dtype = xs.pos.dtype
+    if dtype is not None:
+        xs = _astype(xs, dtype)
+
     zero_trafo = base.Transform.zero((xs.shape(),))
+    if dtype is not None:
+        zero_trafo = _astype(zero_trafo, dtype)
     for i, p in enumerate(sys.link_parents):
         if p == -1:
             xs = _overwrite_transform_of_link_then_update(sys, xs, zero_trafo, i)
+
+    if dtype is not None:
+        xs = _astype(xs, in_dtype)
     return xs
 
 
@@ -232,7 +278,7 @@ def _overwrite_transform_of_link_then_update(
     assert xs_new_link.ndim() == (xs.ndim() - 1) == 2
     transform1, transform2 = unzip_xs(sys, xs)
     transform1 = _replace_transform_of_link(transform1, xs_new_link, new_link_idx)
-    zero_trafo = base.Transform.zero((xs_new_link.shape(),))
+    zero_trafo = _astype(base.Transform.zero((xs_new_link.shape(),)), xs.pos.dtype)
     transform2 = _replace_transform_of_link(transform2, zero_trafo, new_link_idx)
     return zip_xs(sys, transform1, transform2)
 
@@ -263,26 +309,30 @@ def scale_xs(
     Returns:
         Transform: Time-series of scaled transforms.
     """
-    _checks_time_series_of_xs(sys, xs)
+    # `exclude` is a static jit argument of the implementation and thus must
+    # be hashable
+    return _scale_xs(sys, xs, factor, tuple(exclude))
+
 
-    @jax.vmap
-    def _scale_xs(xs):
-        def f(_, __, i: int, type: str):
-            x_link = xs[i]
-            if type not in exclude:
-                x_link = _scale_transform_based_on_type(x_link, type, factor)
-            return x_link
+@partial(jax.jit, static_argnames="exclude")
+def _scale_xs(
+    sys: base.System,
+    xs: base.Transform,
+    factor: float,
+    exclude: tuple[str, ...],
+) -> base.Transform:
+    _checks_time_series_of_xs(sys, xs)
 
-        return sys.scan(f, "ll", list(range(sys.num_links())), sys.link_types)
+    # precomputed per-link masks turn the per-link branching into two
+    # broadcast `where`s over the full (T, L) batch
+    def mask(scale_types: list[str]) -> jax.Array:
+        return jnp.array(
+            [(t in scale_types and t not in exclude) for t in sys.link_types]
+        )[:, None]
 
-    return _scale_xs(xs)
+    pos = jnp.where(mask(["px", "py", "pz", "free"]), xs.pos * factor, xs.pos)
 
+    rot_scaled = maths.quat_scale_angle(xs.rot, factor)
+    rot = jnp.where(mask(["rx", "ry", "rz", "spherical", "free"]), rot_scaled, xs.rot)
 
-def _scale_transform_based_on_type(x: base.Transform, link_type: str, factor: float):
-    pos, rot = x.pos, x.rot
-    if link_type in ["px", "py", "pz", "free"]:
-        pos = pos * factor
-    if link_type in ["rx", "ry", "rz", "spherical", "free"]:
-        axis, angle = maths.quat_to_rot_axis(rot)
-        rot = maths.quat_rot_axis(axis, angle * factor)
     return base.Transform(pos, rot)
@@ -13,6 +13,8 @@ from .path import parse_path
 from .utils import dict_to_nested
 from .utils import dict_union
 from .utils import import_lib
+from .utils import msgpack_load
+from .utils import msgpack_save
 from .utils import pickle_load
 from .utils import pickle_save
 from .utils import pytree_deepcopy
@@ -3,11 +3,11 @@ from typing import Callable, TypeVar
 
 import jax
 import jax.numpy as jnp
+import numpy as np
 from ring.algorithms.generator import types
 import tree_utils
 
 KEY = jax.random.PRNGKey(777)
-KEY_PERMUTATION = jax.random.PRNGKey(888)
 
 
 X = TypeVar("X")
@@ -21,28 +21,54 @@ def make_normalizer_from_generator(
 ) -> Normalizer:
     "Returns a pure function that normalizes `X`."
 
-    # probe generator for its batchsize
-    X, _ = generator(KEY)
+    # probe generator for its batchsize; `eval_shape` only traces abstractly,
+    # so no compile or device execution happens just to read off a shape
+    X, _ = jax.eval_shape(generator, KEY)
     bs = tree_utils.tree_shape(X)
     assert tree_utils.tree_ndim(X) == 3, "`generator` must be batched."
 
     # how often do we have to query the generator
     number_of_gen_calls = math.ceil(approx_with_large_batchsize / bs)
 
-    Xs, key = [], KEY
+    # obtain statistics in a single streaming pass; memory stays at one
+    # feature vector per leaf instead of stacking all generated batches.
+    # per-batch moments are centered on device and merged on host in float64
+    # (Chan's parallel algorithm) because the naive `E[x^2] - mean^2` form
+    # cancels catastrophically for channels with large means (gravity in acc)
+    n = 0
+    mean = jax.tree_map(lambda leaf: np.zeros(leaf.shape[2:]), X)
+    m2 = jax.tree_map(lambda leaf: np.zeros(leaf.shape[2:]), X)
+    key = KEY
     for _ in range(number_of_gen_calls):
         key, consume = jax.random.split(key)
-        Xs.append(generator(consume)[0])
-    Xs = tree_utils.tree_batch(Xs, True, "jax")
-    # permute 0-th axis, since batchsize of generator might be larger than
-    # `approx_with_large_batchsize`, then we would not get a representative
-    # subsample otherwise
-    Xs = jax.tree_map(lambda arr: jax.random.permutation(KEY_PERMUTATION, arr), Xs)
-    Xs = tree_utils.tree_slice(Xs, start=0, slice_size=approx_with_large_batchsize)
-
-    # obtain statistics
-    mean = jax.tree_map(lambda arr: jnp.mean(arr, axis=(0, 1)), Xs)
-    std = jax.tree_map(lambda arr: jnp.std(arr, axis=(0, 1)), Xs)
+        X_batch = generator(consume)[0]
+        n_batch = tree_utils.tree_shape(X_batch) * tree_utils.tree_shape(
+            X_batch, axis=1
+        )
+        mean_batch = jax.tree_map(lambda arr: jnp.mean(arr, axis=(0, 1)), X_batch)
+        m2_batch = jax.tree_map(
+            lambda arr, mu: jnp.sum(jnp.square(arr - mu), axis=(0, 1)),
+            X_batch,
+            mean_batch,
+        )
+        mean_batch = jax.tree_map(
+            lambda a: np.asarray(a, dtype=np.float64), mean_batch
+        )
+        m2_batch = jax.tree_map(lambda a: np.asarray(a, dtype=np.float64), m2_batch)
+
+        delta = jax.tree_map(lambda mu_b, mu: mu_b - mu, mean_batch, mean)
+        n_merged = n + n_batch
+        mean = jax.tree_map(lambda mu, d: mu + d * (n_batch / n_merged), mean, delta)
+        m2 = jax.tree_map(
+            lambda a, b, d: a + b + np.square(d) * (n * n_batch / n_merged),
+            m2,
+            m2_batch,
+            delta,
+        )
+        n = n_merged
+
+    mean = jax.tree_map(jnp.asarray, mean)
+    std = jax.tree_map(lambda s2: jnp.sqrt(jnp.clip(jnp.asarray(s2) / n, 0.0)), m2)
 
     if verbose:
         print("Mean: ", mean)
@@ -159,3 +159,26 @@ def pickle_load(
     with open(path, "rb") as file:
         obj = pickle.load(file)
     return obj
+
+
+def msgpack_save(pytree, path, overwrite: bool = False):
+    "Save pytree of arrays with flax's msgpack serialization; zero-copies buffers."
+    from flax import serialization
+
+    path = parse_path(path, extension="msgpack", file_exists_ok=overwrite)
+    with open(path, "wb") as file:
+        file.write(serialization.to_bytes(pytree))
+
+
+def msgpack_load(path):
+    """Load a pytree of arrays saved with `msgpack_save`.
+
+    NOTE: msgpack only stores the leaves, so containers come back as plain
+    dicts of numpy arrays; unlike `pickle_load` it does not restore custom
+    pytree node types.
+    """
+    from flax import serialization
+
+    path = parse_path(path, extension="msgpack", require_is_file=True)
+    with open(path, "rb") as file:
+        return serialization.msgpack_restore(file.read())
@@ -83,3 +83,25 @@ def test_quat_project():
     q_pri, q_res = maths.quat_project(q, axis)
     np.testing.assert_allclose(angle, maths.quat_angle(q_pri))
     np.testing.assert_allclose(jnp.array(0.0), maths.quat_angle(q_res))
+
+
+def test_quat_scale_angle():
+    qs = maths.quat_random(jax.random.PRNGKey(1), (32,))
+    for factor in [0.0, 0.3, 1.0, 2.5]:
+        axis, angle = maths.quat_to_rot_axis(qs)
+        np.testing.assert_allclose(
+            maths.quat_scale_angle(qs, factor),
+            maths.quat_rot_axis(axis, angle * factor),
+            rtol=1e-5,
+            atol=1e-5,
+        )
+
+    # small-angle branch around the 1e-6 vector-norm cutoff
+    axis = jnp.array([0.0, 0, 1])
+    for angle in [1e-8, 1e-6, 1e-4]:
+        q = maths.quat_rot_axis(axis, jnp.array(angle))
+        np.testing.assert_allclose(
+            maths.quat_scale_angle(q, 0.5),
+            maths.quat_rot_axis(axis, jnp.array(angle / 2)),
+            atol=1e-7,
+        )
@@ -0,0 +1,92 @@
+import jax
+import jax.numpy as jnp
+import numpy as np
+import tree_utils
+
+import ring
+from ring.ml import base as ml_base
+
+
+class _EchoFilter(ml_base.AbstractFilter):
+    "Returns its input unchanged so that wrapper transformations can be asserted."
+
+    def _apply_batched(self, X, params, state, y, lam):
+        return X, state
+
+    def init(self, bs=None, X=None, lam=None, seed: int = 1):
+        return None, None
+
+
+def _scale_X_dict_concat(X, factors):
+    "The original dict-based implementation of `ScaleX_FilterWrapper.apply`."
+    num_batch_dims = X.ndim - 1
+    F = X.shape[-1]
+    if F == 6:
+        X = dict(acc=X[..., :3], gyr=X[..., 3:])
+    elif F == 9:
+        X = dict(acc=X[..., :3], gyr=X[..., 3:6], joint_axes=X[..., 6:])
+    else:
+        X = dict(
+            acc=X[..., :3], gyr=X[..., 3:6], joint_axes=X[..., 6:9], dt=X[..., 9:10]
+        )
+    X = {key: val * factors[key] for key, val in X.items()}
+    # NOTE: `batch_concat_acme` flattens the dict in sorted key order, so for
+    # F=10 the columns come out as (acc, dt, gyr, joint_axes)
+    return tree_utils.batch_concat_acme(X, num_batch_dims=num_batch_dims)
+
+
+class _CumsumFilter(ml_base.AbstractFilterStepwise):
+    "Minimal stepwise filter; its rollout is a cumulative sum over time."
+
+    def _step(self, X_t, params, state, lam):
+        state = state + X_t
+        return state, state
+
+    def init(self, bs=None, X=None, lam=None, seed: int = 1):
+        state = jnp.zeros(X.shape[-2:])
+        if bs is not None:
+            state = jnp.repeat(state[None], bs, axis=0)
+        return None, state
+
+
+def test_stepwise_filter():
+    X = jax.random.uniform(jax.random.PRNGKey(1), (2, 10, 3, 6))
+    filter = _CumsumFilter()
+
+    # `state=None` must be initialized internally, like in `RING`
+    yhat, state = filter.apply(X)
+    np.testing.assert_allclose(yhat, jnp.cumsum(X, axis=1), rtol=1e-6, atol=1e-6)
+    np.testing.assert_allclose(state, yhat[:, -1], rtol=1e-6, atol=1e-6)
+
+    # rolling out from the returned state continues the sequence
+    yhat2, _ = filter.apply(X, state=state)
+    np.testing.assert_allclose(
+        yhat2, jnp.cumsum(X, axis=1) + state[:, None], rtol=1e-5, atol=1e-5
+    )
+
+
+def test_ring_apply_reuses_state():
+    lam = (-1, 0)
+    net = ring.ml.RING(
+        lam=lam, hidden_state_dim=10, message_dim=2, stack_rnn_cells=1
+    )
+    X = jnp.zeros((1, 5, 2, 9))
+    params, state = net.init(bs=1, X=X, lam=lam)
+
+    # without opt-in buffer donation the same state can back multiple calls
+    yhat1, _ = net.apply(X, params=params, state=state, lam=lam)
+    yhat2, _ = net.apply(X, params=params, state=state, lam=lam)
+    np.testing.assert_allclose(yhat1, yhat2, rtol=1e-6, atol=1e-6)
+
+
+def test_scale_x_matches_dict_concat_baseline():
+    wrapper = ml_base.ScaleX_FilterWrapper(_EchoFilter())
+    for F in [6, 9, 10]:
+        X = jax.random.uniform(jax.random.PRNGKey(F), (2, 10, 3, F))
+        Xhat, _ = wrapper.apply(X)
+        np.testing.assert_allclose(
+            Xhat,
+            _scale_X_dict_concat(X, ml_base._default_factors),
+            rtol=1e-6,
+            atol=1e-6,
+        )
@@ -1,7 +1,12 @@
+import jax
+import jax.numpy as jnp
+import numpy as np
 import pytest
 
 from ring.utils import dict_to_nested
 from ring.utils import dict_union
+from ring.utils import msgpack_load
+from ring.utils import msgpack_save
 from ring.utils import tree_equal
 
 
@@ -31,3 +36,21 @@ def test_dict_union():
 def test_dict_nest():
     d = dict(x=1)
     assert tree_equal(dict(x=dict(fancy=1)), dict_to_nested(d, "fancy"))
+
+
+def test_msgpack_roundtrip(tmp_path):
+    params = dict(
+        layer1=dict(
+            w=jnp.arange(6, dtype=jnp.float32).reshape(2, 3), b=jnp.zeros((3,))
+        ),
+        layer2=dict(w=jnp.ones((3, 1))),
+    )
+    path = str(tmp_path / "params.msgpack")
+
+    msgpack_save(params, path)
+    restored = msgpack_load(path)
+
+    assert jax.tree_util.tree_structure(restored) == jax.tree_util.tree_structure(
+        params
+    )
+    jax.tree_map(np.testing.assert_allclose, restored, params)